@@ -1,16 +1,23 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
+import numpy as np
 import json
 from datetime import datetime
 import plotly.express as px
 import base64
 import random
-import io
-from reportlab.lib.pagesizes import letter
+from string import Template
+import os
+import re
+import time
+import uuid
+import atexit
+import tempfile
+import threading
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+from pdf_report import create_pdf, catalog_entry, MAX_REFLECTION_CHARS, MAX_SHORT_TEXT_CHARS
 
 # Set page config for mobile
 st.set_page_config(
@@ -140,6 +147,166 @@ document.addEventListener('DOMContentLoaded', function() {
 </script>
 """, unsafe_allow_html=True)
 
+# --- Draft Autosave ---
+DRAFT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".drafts")
+DRAFT_KEY_PATTERN = re.compile(r"^(option_\d+|why_.+|whose_.+|val[123]_.+)$")
+DRAFT_COOKIE = "pm_draft"
+DRAFT_TTL_SECONDS = 7 * 24 * 3600
+
+class DraftAutosaver:
+    # Write-behind store for in-progress reflections. Reruns only hand over the
+    # latest fields (None means "delete"); a background thread waits until
+    # typing pauses for `delay` seconds (or `max_delay` has passed) and then
+    # writes one file per draft. Drafts untouched for `ttl` seconds are pruned.
+    def __init__(self, directory, delay=1.5, max_delay=10.0, ttl=DRAFT_TTL_SECONDS):
+        self.directory = directory
+        self.delay = delay
+        self.max_delay = max_delay
+        self.ttl = ttl
+        self._pending = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+        # Held while a draft file is written or removed, so a discard can
+        # never be undone by a flush that picked the draft up just before it
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._last_prune = 0.0
+        os.makedirs(directory, exist_ok=True)
+        self.prune()
+        threading.Thread(target=self._run, daemon=True).start()
+        atexit.register(self.flush)
+
+    def _path(self, draft_id):
+        return os.path.join(self.directory, f"{draft_id}.json")
+
+    def _queue(self, draft_id, fields):
+        with self._lock:
+            version = self._versions.get(draft_id, 0) + 1
+            self._versions[draft_id] = version
+            self._pending[draft_id] = (version, fields)
+        self._wake.set()
+
+    def submit(self, draft_id, fields):
+        self._queue(draft_id, fields)
+
+    def load(self, draft_id):
+        with self._lock:
+            if draft_id in self._pending:
+                return dict(self._pending[draft_id][1] or {})
+        try:
+            with open(self._path(draft_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def discard(self, draft_id):
+        # Off the critical path: the worker removes the file on its next flush
+        self._queue(draft_id, None)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for draft_id, (version, fields) in pending.items():
+            with self._io_lock:
+                with self._lock:
+                    if self._versions.get(draft_id) != version:
+                        continue
+                if fields is None:
+                    self._remove(self._path(draft_id))
+                else:
+                    fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+                    try:
+                        with os.fdopen(fd, "w", encoding="utf-8") as f:
+                            json.dump(fields, f, ensure_ascii=False)
+                        os.replace(tmp_path, self._path(draft_id))
+                    except OSError:
+                        self._remove(tmp_path)
+                # Nothing newer is queued, so the version can be forgotten
+                # instead of keeping one entry per draft for the server's life
+                with self._lock:
+                    if self._versions.get(draft_id) == version:
+                        del self._versions[draft_id]
+
+    def prune(self):
+        cutoff = time.time() - self.ttl
+        self._last_prune = time.monotonic()
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    with self._io_lock:
+                        self._remove(entry.path)
+            except OSError:
+                pass
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            deadline = time.monotonic() + self.max_delay
+            while self._wake.wait(min(self.delay, max(deadline - time.monotonic(), 0))):
+                self._wake.clear()
+            self.flush()
+            if time.monotonic() - self._last_prune > 3600:
+                self.prune()
+
+@st.cache_resource
+def get_draft_autosaver():
+    return DraftAutosaver(DRAFT_DIR)
+
+autosaver = get_draft_autosaver()
+
+# The draft id lives in a same-site browser cookie rather than the shareable
+# URL, so a reconnecting session in this browser can find its draft
+draft_id = st.context.cookies.get(DRAFT_COOKIE, "") or st.session_state.get("draft_id", "")
+if not re.fullmatch(r"[0-9a-f]{32}", draft_id):
+    draft_id = uuid.uuid4().hex
+if st.session_state.get("draft_id") != draft_id:
+    st.session_state.draft_id = draft_id
+    components.html(
+        f"<script>window.parent.document.cookie = '{DRAFT_COOKIE}={draft_id}; "
+        f"max-age={DRAFT_TTL_SECONDS}; path=/; SameSite=Strict';</script>",
+        height=0
+    )
+
+if "draft_restored" not in st.session_state:
+    st.session_state.draft_restored = True
+    restored = {k: v for k, v in autosaver.load(draft_id).items() if k not in st.session_state}
+    st.session_state.update(restored)
+    st.session_state.draft_last_saved = dict(restored)
+    # Show as many option inputs as the draft has option names
+    option_indices = [
+        int(k.split("_")[1]) for k, v in restored.items()
+        if re.fullmatch(r"option_\d+", k) and v.strip()
+    ]
+    if option_indices:
+        st.session_state.restored_num_options = min(max(max(option_indices) + 1, 1), 10)
+    if restored:
+        st.toast("📝 Restored your unsaved reflections.")
+
+def autosave_draft():
+    fields = {
+        k: v for k, v in st.session_state.items()
+        if isinstance(k, str) and isinstance(v, str) and DRAFT_KEY_PATTERN.match(k)
+    }
+    if fields == st.session_state.get("draft_last_saved"):
+        return
+    st.session_state.draft_last_saved = fields
+    # Option names alone are not worth keeping on disk
+    if any(v.strip() for k, v in fields.items() if not k.startswith("option_")):
+        autosaver.submit(draft_id, fields)
+    else:
+        autosaver.discard(draft_id)
+
 # Title & Description
 st.markdown('<div class="fade-in">', unsafe_allow_html=True)
 st.title("🧭 The Philosopher's Mirror")
@@ -151,9 +318,13 @@ with st.expander("⚙️ Settings"):
     use_custom_aspects = st.checkbox("Use custom aspects?", value=False)
     dark_mode = st.checkbox("Dark Mode", value=True)
     show_animations = st.checkbox("Show Animations", value=True)
+    st.caption("📝 Unsaved reflections are autosaved on this server for 7 days, linked to this browser. Tabs in the same browser share one draft; it is deleted once you unlock insights or reset.")
+    group_mode = st.checkbox("Group mode (aggregate many participants)?", value=False)
+    hide_dominated = st.checkbox("Hide dominated options?", value=False)
     
     st.divider()
     if st.button("🔄 Reset All Data"):
+        autosaver.discard(draft_id)
         for key in list(st.session_state.keys()):
             del st.session_state[key]
         st.rerun()
@@ -188,10 +359,14 @@ mood_insights = {
 st.markdown(f'<div class="insight-box">{mood_insights[mood]}</div>', unsafe_allow_html=True)
 
 # --- Step 1: Input Options ---
-num_options = st.number_input("How many options do you want to evaluate?", min_value=1, max_value=10, step=1, value=2)
+num_options = st.number_input(
+    "How many options do you want to evaluate?",
+    min_value=1, max_value=10, step=1,
+    value=st.session_state.get("restored_num_options", 2)
+)
 options = []
 for i in range(num_options):
-    option_name = st.text_input(f"Enter name for Option {i+1}", key=f"option_{i}").strip()
+    option_name = st.text_input(f"Enter name for Option {i+1}", key=f"option_{i}", max_chars=MAX_SHORT_TEXT_CHARS).strip()
     if option_name:
         options.append(option_name)
 
@@ -204,7 +379,7 @@ if use_custom_aspects:
     aspects = []
     num_aspects = st.number_input("Number of aspects:", min_value=1, max_value=10, value=6)
     for i in range(num_aspects):
-        aspect = st.text_input(f"Aspect {i+1}:", key=f"aspect_{i}", value="")
+        aspect = st.text_input(f"Aspect {i+1}:", key=f"aspect_{i}", value="", max_chars=MAX_SHORT_TEXT_CHARS)
         if aspect.strip():
             aspects.append(aspect.strip())
     if not aspects:
@@ -234,7 +409,7 @@ aspect_insights = {
     "Intuition": "How much you trust your gut feeling. High weight means you listen to your inner voice."
 }
 
-def render_aspect_input(aspect, icon, description, insight_map, weights, scores, reflections, option=None):
+def render_aspect_input(aspect, icon, description, insight_map, weights, scores, reflections, option=None, default=3):
     st.markdown(f"<h4>{icon} {aspect}</h4>", unsafe_allow_html=True)
     st.write(f"💡 *{description}*")
     
@@ -243,7 +418,7 @@ def render_aspect_input(aspect, icon, description, insight_map, weights, scores,
     
     score = st.slider(
         f"Rate {aspect}{' for ' + option if option else ''}",
-        1, 5, 3,
+        1, 5, default,
         key=key_prefix,
         help=help_text
     )
@@ -254,6 +429,7 @@ def render_aspect_input(aspect, icon, description, insight_map, weights, scores,
             f"🧠 Reflect: What made you choose {score} for {aspect}?",
             key=f"why_{option}_{aspect}",
             height=100,
+            max_chars=MAX_REFLECTION_CHARS,
             placeholder="Share your thoughts, memories, or feelings..."
         )
         reflections[option][aspect] = {"score": score, "why": why}
@@ -291,7 +467,8 @@ aspect_insights_map = {
 
 for aspect in aspects:
     icon = aspect_icons.get(aspect, "🔍")
-    render_aspect_input(aspect, icon, aspect_insights[aspect], aspect_insights_map, weights, {}, {}, None)
+    default_weight = st.session_state.get("suggested_weights", {}).get(aspect, 3)
+    render_aspect_input(aspect, icon, aspect_insights[aspect], aspect_insights_map, weights, {}, {}, None, default_weight)
 
 # --- Total Weight Summary ---
 total_weight = sum(weights.values())
@@ -335,6 +512,7 @@ for option in options:
     whose = st.text_input(
         f"Whose opinion mattered most for {option}?", 
         key=f"whose_{option}",
+        max_chars=MAX_SHORT_TEXT_CHARS,
         placeholder="e.g., My parents, My mentor, My friend..."
     )
     reflections[option]["social"] = {"influence": social, "whose": whose}
@@ -342,9 +520,9 @@ for option in options:
     # Values Section
     st.markdown(f'<div class="option-card"><h3>🌟 Your Core Values for {option}</h3></div>', unsafe_allow_html=True)
     st.write("List your top 3 values that matter most in this decision:")
-    val1 = st.text_input("Value 1", key=f"val1_{option}", placeholder="e.g., Freedom")
-    val2 = st.text_input("Value 2", key=f"val2_{option}", placeholder="e.g., Growth")
-    val3 = st.text_input("Value 3", key=f"val3_{option}", placeholder="e.g., Compassion")
+    val1 = st.text_input("Value 1", key=f"val1_{option}", placeholder="e.g., Freedom", max_chars=MAX_SHORT_TEXT_CHARS)
+    val2 = st.text_input("Value 2", key=f"val2_{option}", placeholder="e.g., Growth", max_chars=MAX_SHORT_TEXT_CHARS)
+    val3 = st.text_input("Value 3", key=f"val3_{option}", placeholder="e.g., Compassion", max_chars=MAX_SHORT_TEXT_CHARS)
     reflections[option]["values"] = [val1, val2, val3]
 
 # --- Progress Tracker ---
@@ -362,6 +540,274 @@ st.progress(progress / 100)
 st.write(f"🎯 Reflection Progress: {completed_aspects}/{total_aspects} aspects completed")
 st.markdown('</div>', unsafe_allow_html=True)
 
+# Queue a draft save once every reflection widget has been rendered
+autosave_draft()
+
+# --- Similar Past Decisions ---
+class DecisionIndex:
+    # Exact cosine-similarity index over saved decisions. Weight vectors and
+    # per-option score vectors are kept as unit rows in growable matrices
+    # aligned to a shared aspect vocabulary, so a lookup is two matrix
+    # products and adding a decision never rebuilds what is already indexed.
+    # Both are centred on the neutral 3 first: raw 1-5 vectors are all
+    # positive and always have a high cosine with each other, whereas centred
+    # ones separate "matters more than usual" from "matters less".
+    def __init__(self):
+        self.count = 0
+        self.vocab = {}
+        self._weights = np.zeros((64, 8))
+        self._option_scores = np.zeros((256, 8))
+        self._option_owner = np.zeros(256, dtype=np.int64)
+        self._option_rows = 0
+
+    def _ensure_capacity(self, decisions, option_rows, dims):
+        def grow(matrix, rows):
+            new_rows = max(rows, 2 * matrix.shape[0]) if rows > matrix.shape[0] else matrix.shape[0]
+            new_cols = max(dims, 2 * matrix.shape[1]) if dims > matrix.shape[1] else matrix.shape[1]
+            if (new_rows, new_cols) == matrix.shape:
+                return matrix
+            grown = np.zeros((new_rows, new_cols))
+            grown[:matrix.shape[0], :matrix.shape[1]] = matrix
+            return grown
+        self._weights = grow(self._weights, decisions)
+        self._option_scores = grow(self._option_scores, option_rows)
+        if option_rows > len(self._option_owner):
+            self._option_owner = np.resize(self._option_owner, max(option_rows, 2 * len(self._option_owner)))
+
+    def _vectorize(self, aspects, values, center=0):
+        vector = np.zeros(self._weights.shape[1])
+        for aspect in aspects:
+            if aspect in self.vocab and aspect in values:
+                vector[self.vocab[aspect]] = float(values[aspect]) - center
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def add(self, decision):
+        for aspect in decision['aspects']:
+            self.vocab.setdefault(aspect, len(self.vocab))
+        options = [opt for opt in decision['options'] if opt in decision['scores']]
+        self._ensure_capacity(self.count + 1, self._option_rows + len(options), len(self.vocab))
+        self._weights[self.count] = self._vectorize(decision['aspects'], decision['weights'], center=3)
+        for opt in options:
+            self._option_scores[self._option_rows] = self._vectorize(decision['aspects'], decision['scores'][opt], center=3)
+            self._option_owner[self._option_rows] = self.count
+            self._option_rows += 1
+        self.count += 1
+
+    def query(self, aspects, weights, scores, k=3, exclude=(), min_similarity=0.1):
+        if not self.count:
+            return []
+        weight_sim = self._weights[:self.count] @ self._vectorize(aspects, weights, center=3)
+        score_sim = np.zeros(self.count)
+        if scores and self._option_rows:
+            current = np.array([self._vectorize(aspects, option_scores, center=3) for option_scores in scores.values()])
+            best_per_row = (self._option_scores[:self._option_rows] @ current.T).max(axis=1)
+            score_sim = np.full(self.count, -1.0)
+            np.maximum.at(score_sim, self._option_owner[:self._option_rows], best_per_row)
+        similarity = (weight_sim + score_sim) / 2
+        similarity[list(exclude)] = -np.inf
+        k = min(k, self.count - len(exclude))
+        if k <= 0:
+            return []
+        top = np.argpartition(-similarity, k - 1)[:k]
+        top = top[np.argsort(-similarity[top])]
+        # Neutral (all-3) input centres to a zero vector and scores 0 against
+        # everything, so near-zero matches are not shown as "similar"
+        return [(int(i), float(similarity[i])) for i in top if similarity[i] > min_similarity]
+
+def get_decision_index():
+    saved = st.session_state.get("saved_decisions", [])
+    if "decision_index" not in st.session_state or st.session_state.decision_index.count > len(saved):
+        st.session_state.decision_index = DecisionIndex()
+    index = st.session_state.decision_index
+    for decision in saved[index.count:]:
+        index.add(decision)
+    return index
+
+if st.session_state.get("saved_decisions"):
+    # Skip the decision just unlocked from this same input, which would
+    # otherwise always top the list at 1.00
+    just_saved = set()
+    if st.session_state.get("last_saved_input") == (options, aspects, weights, scores):
+        just_saved.add(st.session_state.last_saved_index)
+    matches = get_decision_index().query(aspects, weights, scores, exclude=just_saved)
+    with st.expander("🔎 Similar Past Decisions"):
+        if not matches:
+            st.write("No similar past decisions yet.")
+        for rank, (i, similarity) in enumerate(matches):
+            past = st.session_state.saved_decisions[i]
+            st.markdown(
+                f"**Decision #{i+1}** ({past['timestamp']}) — similarity {similarity:.2f}  \n"
+                f"Options: {', '.join(past['options'])}  \n"
+                f"Weights: {', '.join(f'{a}: {w}' for a, w in past['weights'].items())}"
+            )
+            if st.button(f"Use weights from Decision #{i+1}", key=f"use_weights_{rank}"):
+                st.session_state.suggested_weights = {
+                    a: int(round(float(w))) for a, w in past['weights'].items()
+                }
+                for aspect in aspects:
+                    st.session_state.pop(f"weight_{aspect}", None)
+                st.rerun()
+
+# --- Group Mode: Aggregate Many Participants ---
+SCORE_LEVELS = np.arange(1, 6)
+
+class GroupAggregate:
+    # Stacked (participants x options x aspects) ratings with running aggregates.
+    # Scores are integers 1-5, so a per-cell histogram gives mean, dispersion and
+    # median without rescanning the stack when new submissions arrive.
+    def __init__(self, options, aspects):
+        self.options = list(options)
+        self.aspects = list(aspects)
+        self.count = 0
+        self._scores = np.empty((64, len(self.options), len(self.aspects)), dtype=np.int8)
+        self._weights = np.empty((64, len(self.aspects)), dtype=np.int8)
+        self._hist = np.zeros((len(self.options), len(self.aspects), len(SCORE_LEVELS)), dtype=np.int64)
+        self._weight_sum = np.zeros(len(self.aspects), dtype=np.int64)
+        self.own_index = None
+
+    @property
+    def stacked(self):
+        return self._scores[:self.count]
+
+    @staticmethod
+    def _ratings(values):
+        # Round to the nearest 1-5 rating; NaN/inf (which json.load accepts)
+        # would otherwise become 0 and silently skew the histogram
+        values = np.asarray(values, dtype=float)
+        if not np.isfinite(values).all():
+            raise ValueError("ratings must be finite numbers")
+        return np.clip(np.rint(values), 1, 5).astype(np.int8)
+
+    def add_many(self, score_stack, weight_stack):
+        score_stack = self._ratings(score_stack)
+        weight_stack = self._ratings(weight_stack)
+        end = self.count + len(score_stack)
+        if end > len(self._scores):
+            capacity = max(end, 2 * len(self._scores))
+            self._scores = np.concatenate([self._scores[:self.count], np.empty((capacity - self.count,) + self._scores.shape[1:], dtype=np.int8)])
+            self._weights = np.concatenate([self._weights[:self.count], np.empty((capacity - self.count,) + self._weights.shape[1:], dtype=np.int8)])
+        self._scores[self.count:end] = score_stack
+        self._weights[self.count:end] = weight_stack
+        self._hist += (score_stack[..., None] == SCORE_LEVELS).sum(axis=0)
+        self._weight_sum += weight_stack.sum(axis=0, dtype=np.int64)
+        self.count = end
+
+    def _stacks(self, submissions):
+        # Each submission: {"scores": {option: {aspect: 1-5}}, "weights": {aspect: 1-5}}
+        # Missing ratings default to a neutral 3, as in the single-user flow.
+        score_stack = [
+            [[sub.get("scores", {}).get(opt, {}).get(a, 3) for a in self.aspects] for opt in self.options]
+            for sub in submissions
+        ]
+        weight_stack = [[sub.get("weights", {}).get(a, 3) for a in self.aspects] for sub in submissions]
+        return score_stack, weight_stack
+
+    def add_submissions(self, submissions):
+        score_stack, weight_stack = self._stacks(submissions)
+        if score_stack:
+            self.add_many(score_stack, weight_stack)
+
+    def set_own(self, scores, weights):
+        # The current user counts as one participant: adding again replaces
+        # their earlier ratings instead of counting them twice
+        if self.own_index is None:
+            self.own_index = self.count
+            self.add_submissions([{"scores": scores, "weights": weights}])
+            return
+        score_stack, weight_stack = self._stacks([{"scores": scores, "weights": weights}])
+        new_scores = self._ratings(score_stack)[0]
+        new_weights = self._ratings(weight_stack)[0]
+        i = self.own_index
+        self._hist += (new_scores[..., None] == SCORE_LEVELS).astype(np.int64) - (self._scores[i][..., None] == SCORE_LEVELS)
+        self._weight_sum += new_weights.astype(np.int64) - self._weights[i]
+        self._scores[i] = new_scores
+        self._weights[i] = new_weights
+
+    def mean(self):
+        return (self._hist * SCORE_LEVELS).sum(axis=-1) / self.count
+
+    def std(self):
+        mean_sq = (self._hist * SCORE_LEVELS ** 2).sum(axis=-1) / self.count
+        return np.sqrt(np.maximum(mean_sq - self.mean() ** 2, 0))
+
+    def median(self):
+        cumulative = self._hist.cumsum(axis=-1)
+        lower = (cumulative < (self.count + 1) // 2).sum(axis=-1)
+        upper = (cumulative < self.count // 2 + 1).sum(axis=-1)
+        return (SCORE_LEVELS[lower] + SCORE_LEVELS[upper]) / 2
+
+    def mean_weights(self):
+        return self._weight_sum / self.count
+
+    def to_frame(self, values):
+        return pd.DataFrame(np.round(values, 2), index=self.options, columns=self.aspects)
+
+group = None
+if group_mode:
+    st.subheader("👥 Group Ratings")
+    group_key = (tuple(options), tuple(aspects))
+    if st.session_state.get("group_key") != group_key:
+        previous = st.session_state.get("group_aggregate")
+        if previous is not None and previous.own_index is not None:
+            st.session_state.group_reset_notice = True
+        st.session_state.group_key = group_key
+        st.session_state.group_aggregate = GroupAggregate(options, aspects)
+        st.session_state.group_files = set()
+    group = st.session_state.group_aggregate
+
+    if st.session_state.get("group_reset_notice"):
+        st.warning("⚠️ Options or aspects changed, so group ratings were reset. Uploaded files are read again; add your own ratings again.")
+
+    own_label = "➕ Add my ratings as a participant" if group.own_index is None else "🔁 Update my ratings"
+    if st.button(own_label):
+        group.set_own(scores, weights)
+        st.session_state.group_reset_notice = False
+        st.rerun()
+
+    uploaded = st.file_uploader(
+        "Upload participant submissions (JSON list of {\"scores\": ..., \"weights\": ...})",
+        type="json",
+        key="group_upload"
+    )
+    if uploaded is not None and uploaded.file_id not in st.session_state.group_files:
+        try:
+            submissions = json.load(uploaded)
+            if isinstance(submissions, dict):
+                submissions = [submissions]
+            group.add_submissions(submissions)
+            st.session_state.group_files.add(uploaded.file_id)
+        except (ValueError, AttributeError, TypeError):
+            st.error("⚠️ Could not read submissions — expected a JSON list of participant ratings.")
+
+    st.write(f"👥 **Participants:** {group.count}")
+    if group.count:
+        agg_view = st.radio("Show", ["Mean", "Median", "Dispersion (std)"], horizontal=True, key="group_view")
+        if agg_view == "Mean":
+            st.dataframe(group.to_frame(group.mean()))
+        elif agg_view == "Median":
+            st.dataframe(group.to_frame(group.median()))
+        else:
+            st.dataframe(group.to_frame(group.std()))
+
+# --- Pareto Frontier ---
+def pareto_frontier(score_matrix):
+    # Skyline over an (options x aspects) matrix: True where no other option is
+    # at least as good on every aspect. A dominator always has a strictly higher
+    # row sum, so visiting rows by descending sum means each row only needs one
+    # vectorized check against the frontier found so far. Of identical rows,
+    # only the first is kept.
+    score_matrix = np.asarray(score_matrix)
+    on_frontier = np.zeros(len(score_matrix), dtype=bool)
+    frontier = []
+    for idx in np.argsort(-score_matrix.sum(axis=1), kind="stable"):
+        row = score_matrix[idx]
+        if frontier and (score_matrix[frontier] >= row).all(axis=1).any():
+            continue
+        frontier.append(idx)
+        on_frontier[idx] = True
+    return on_frontier
+
 # --- Philosophical Lenses ---
 PHILOSOPHICAL_LENS = {
     "stoic": {
@@ -454,6 +900,74 @@ EVOLUTIONARY_INSIGHTS = {
     }
 }
 
+# --- Report Rendering ---
+# Each option's report section (and each past decision) is rendered as one
+# markdown block, so the number of frontend elements no longer grows with the
+# number of aspects. Templates are compiled once; st.cache_data keys the
+# rendered text on a hash of the section content.
+REPORT_SECTION = Template("### 📖 $option\n\n🧠 **Psychological Insights:**\n\n$aspects$social$values$insight")
+REPORT_ASPECT = Template("- **$aspect**: $score — *$why*\n")
+REPORT_SOCIAL = Template("\n👥 **Social Influence**: $influence/5 — *Influenced by $whose*\n")
+REPORT_VALUES = Template("\n🌟 **Core Values**: $values\n")
+
+SUMMARY_OPTION = Template("**$option:**\n\n$aspects$social$values\n")
+SUMMARY_ASPECT = Template("- $aspect: $why\n")
+SUMMARY_SOCIAL = Template("\n👥 Social: Influenced by $whose\n")
+SUMMARY_VALUES = Template("\n🌟 Values: $values\n")
+
+def one_line(text):
+    # Keep multi-line reflections inside their list item / emphasis markers
+    return " ".join(str(text).split())
+
+def insight_name(value, catalog):
+    return catalog_entry(value, catalog).get("name", "N/A")
+
+@st.cache_data(show_spinner=False, max_entries=512)
+def render_option_report(option, aspect_rows, social, values, insight):
+    aspects_md = "".join(
+        REPORT_ASPECT.substitute(aspect=aspect, score=score, why=one_line(why))
+        for aspect, score, why in aspect_rows
+    )
+    social_md = REPORT_SOCIAL.substitute(influence=social[0], whose=one_line(social[1])) if social[1].strip() else ""
+    values_md = REPORT_VALUES.substitute(values=", ".join(values)) if values else ""
+    return REPORT_SECTION.substitute(
+        option=option, aspects=aspects_md, social=social_md, values=values_md, insight=f"\n{insight}\n"
+    )
+
+@st.cache_data(show_spinner=False, max_entries=512)
+def render_decision_summary(decision):
+    sections = []
+    for option in decision['options']:
+        if option not in decision['reflections']:
+            continue
+        ref = decision['reflections'][option]
+        aspects_md = "".join(
+            SUMMARY_ASPECT.substitute(aspect=aspect, why=one_line(ref[aspect]['why']))
+            for aspect in decision['aspects']
+            if aspect in ref and 'why' in ref[aspect] and ref[aspect]['why'].strip()
+        )
+        social_md = ""
+        if 'social' in ref and ref['social']['whose'].strip():
+            social_md = SUMMARY_SOCIAL.substitute(whose=one_line(ref['social']['whose']))
+        vals = [v for v in ref['values'] if v.strip()]
+        values_md = SUMMARY_VALUES.substitute(values=", ".join(vals)) if vals else ""
+        sections.append(SUMMARY_OPTION.substitute(option=option, aspects=aspects_md, social=social_md, values=values_md))
+    footer = "  \n".join([
+        f"🎭 Archetype: {insight_name(decision.get('archetype'), PSYCHOLOGICAL_ARCHETYPES)}",
+        f"🧠 Philosophical Lens: {insight_name(decision.get('philosophical'), PHILOSOPHICAL_LENS)}",
+        f"🧬 Evolutionary Insight: {insight_name(decision.get('evolutionary'), EVOLUTIONARY_INSIGHTS)}",
+        f"✨ Wisdom Score: {decision.get('wisdom_score', 'N/A')}",
+        f"😊 Mood: {decision.get('mood', 'N/A')}",
+    ])
+    return "**Reflection Summary:**\n\n" + "\n".join(sections) + "\n" + footer
+
+# --- PDF Report Engine ---
+PDF_CATALOGS = {
+    "philosophical": PHILOSOPHICAL_LENS,
+    "archetype": PSYCHOLOGICAL_ARCHETYPES,
+    "evolutionary": EVOLUTIONARY_INSIGHTS,
+}
+
 # --- Compute Scores & Show Results ---
 if st.button("✅ Unlock Insights & Wisdom"):
     with st.spinner("Analyzing your decisions through the lens of wisdom... 🧠"):
@@ -466,6 +980,22 @@ if st.button("✅ Unlock Insights & Wisdom"):
         </script>
         """, unsafe_allow_html=True)
         
+        # The user's own ratings, kept for their reflections and for
+        # recognising this decision once it is saved
+        own_weights = dict(weights)
+        own_scores = {opt: dict(option_scores) for opt, option_scores in scores.items()}
+
+        # In group mode, rank and interpret the group's mean ratings and weights
+        using_group = group is not None and group.count > 0
+        if using_group:
+            group_means = group.mean()
+            scores = {
+                opt: {a: round(float(group_means[i, j]), 2) for j, a in enumerate(aspects)}
+                for i, opt in enumerate(options)
+            }
+            weights = {a: round(float(w), 2) for a, w in zip(aspects, group.mean_weights())}
+            st.info(f"👥 Using aggregated ratings from {group.count} participants.")
+
         # Ensure all options have all aspects (even if missing, fill with 3)
         all_aspects = set(aspects)
         for option in scores:
@@ -473,23 +1003,35 @@ if st.button("✅ Unlock Insights & Wisdom"):
                 if aspect not in scores[option]:
                     scores[option][aspect] = 3  # default neutral
         
+        # Prune options that another option matches or beats on every aspect
+        score_matrix = np.array([[scores[opt][a] for a in aspects] for opt in options], dtype=float)
+        on_frontier = dict(zip(options, pareto_frontier(score_matrix)))
+        dominated = [opt for opt in options if not on_frontier[opt]]
+        ranked_options = [opt for opt in options if on_frontier[opt] or not hide_dominated]
+        
         results = []
-        for option, option_scores in scores.items():
-            weighted_total = sum(option_scores[a] * weights[a] for a in aspects)
-            results.append({"Option": option, "Total Score": weighted_total})
+        for option in ranked_options:
+            weighted_total = sum(scores[option][a] * weights[a] for a in aspects)
+            result = {"Option": option, "Total Score": weighted_total}
+            if not hide_dominated:
+                result["Pareto Optimal"] = bool(on_frontier[option])
+            results.append(result)
         
         results_df = pd.DataFrame(results).sort_values(by="Total Score", ascending=False)
         
         # Display results
         st.subheader("🏆 Final Scores & Ranking")
         st.dataframe(results_df.reset_index(drop=True))
+        if dominated:
+            verb = "Hidden" if hide_dominated else "Dominated"
+            st.caption(f"🪶 {verb} (matched or beaten on every aspect by another option): {', '.join(dominated)}")
         
         best_option = results_df.iloc[0]["Option"]
         st.success(f"🎯 Recommended Option: **{best_option}**")
         
         # --- Visual Comparison (Radar Chart) ---
         st.subheader("📈 Visual Comparison (Radar Plot)")
-        chart_data = pd.DataFrame(scores).T
+        chart_data = pd.DataFrame({opt: scores[opt] for opt in ranked_options}).T
         fig = px.line_polar(chart_data, r=chart_data.columns, theta=chart_data.columns, line_close=True, title="Radar Chart of Options", line_shape='spline')
         st.plotly_chart(fig, use_container_width=True)
         
@@ -585,26 +1127,21 @@ if st.button("✅ Unlock Insights & Wisdom"):
         
         # --- Deep Reflection Report ---
         st.subheader("📖 Deep Reflection Report")
-        for option in options:
+        for option in ranked_options:
             if option:
-                st.markdown(f"### 📖 {option}")
-                
-                # Psychological
-                st.write("🧠 **Psychological Insights:**")
-                for aspect in aspects:
-                    why = reflections[option][aspect]["why"]
-                    if why.strip():
-                        st.write(f"- **{aspect}**: {scores[option][aspect]} — *{why}*")
-                
-                # Social
+                # Reflections explain the user's own rating; in group mode the
+                # group mean is shown alongside it, clearly labelled
+                aspect_rows = tuple(
+                    (
+                        aspect,
+                        f"{own_scores[option][aspect]} (group mean {scores[option][aspect]})" if using_group else scores[option][aspect],
+                        reflections[option][aspect]["why"]
+                    )
+                    for aspect in aspects
+                    if reflections[option][aspect]["why"].strip()
+                )
                 social = reflections[option]["social"]
-                if social['whose'].strip():
-                    st.write(f"👥 **Social Influence**: {social['influence']}/5 — *Influenced by {social['whose']}*")
-                
-                # Values
-                vals = [v for v in reflections[option]["values"] if v.strip()]
-                if vals:
-                    st.write(f"🌟 **Core Values**: {', '.join(vals)}")
+                vals = tuple(v for v in reflections[option]["values"] if v.strip())
                 
                 # Evolutionary Insight
                 avg_score = sum(scores[option].values()) / len(scores[option])
@@ -612,8 +1149,9 @@ if st.button("✅ Unlock Insights & Wisdom"):
                     insight = "🧬 This choice reflects high reward-seeking behavior, common in growth-oriented individuals."
                 else:
                     insight = "🧬 This choice reflects security-seeking behavior, common in stability-focused individuals."
-                st.write(insight)
                 reflections[option]["evolutionary"] = insight
+                
+                st.markdown(render_option_report(option, aspect_rows, (social['influence'], social['whose']), vals, insight))
         
         # --- Save Decision ---
         def serialize_for_json(obj):
@@ -635,12 +1173,17 @@ if st.button("✅ Unlock Insights & Wisdom"):
             "scores": scores,
             "reflections": reflections,
             "results": results_df.to_dict(orient='records'),
+            "dominated": dominated,
             "mood": mood,
             "philosophical": philosophical,
             "archetype": archetype,
             "evolutionary": evolutionary,
-            "wisdom_score": wisdom_score
+            "wisdom_score": wisdom_score,
+            "participants": group.count if using_group else 1
         }
+        if using_group:
+            # "scores" holds the group means; keep what this user rated too
+            decision_data["own_scores"] = own_scores
         
         decision_data = serialize_for_json(decision_data)
         
@@ -648,86 +1191,13 @@ if st.button("✅ Unlock Insights & Wisdom"):
         if 'saved_decisions' not in st.session_state:
             st.session_state.saved_decisions = []
         st.session_state.saved_decisions.append(decision_data)
+        st.session_state.last_saved_index = len(st.session_state.saved_decisions) - 1
+        st.session_state.last_saved_input = (options, aspects, own_weights, own_scores)
+        autosaver.discard(draft_id)
+        get_decision_index()
         
         # --- Export to PDF ---
-        def create_pdf(decision_data):
-            buffer = io.BytesIO()
-            doc = SimpleDocTemplate(buffer, pagesize=letter)
-            styles = getSampleStyleSheet()
-            story = []
-
-            # Title
-            story.append(Paragraph("The Philosopher's Mirror - Decision Report", styles['Title']))
-            story.append(Spacer(1, 12))
-
-            # Timestamp
-            story.append(Paragraph(f"<b>Timestamp:</b> {decision_data['timestamp']}", styles['Normal']))
-            story.append(Spacer(1, 12))
-
-            # Options
-            story.append(Paragraph("<b>Options:</b>", styles['Heading2']))
-            for opt in decision_data['options']:
-                story.append(Paragraph(f"• {opt}", styles['Normal']))
-            story.append(Spacer(1, 12))
-
-            # Aspects
-            story.append(Paragraph("<b>Aspects:</b>", styles['Heading2']))
-            for aspect in decision_data['aspects']:
-                story.append(Paragraph(f"• {aspect}", styles['Normal']))
-            story.append(Spacer(1, 12))
-
-            # Results
-            story.append(Paragraph("<b>Results:</b>", styles['Heading2']))
-            for result in decision_data['results']:
-                story.append(Paragraph(f"{result['Option']}: {result['Total Score']}", styles['Normal']))
-            story.append(Spacer(1, 12))
-
-            # Philosophical Insight
-            story.append(Paragraph("<b>Philosophical Lens:</b>", styles['Heading2']))
-            story.append(Paragraph(f"{decision_data['philosophical']['name']}", styles['Normal']))
-            story.append(Paragraph(f"{decision_data['philosophical']['insight']}", styles['Italic']))
-            story.append(Paragraph(f"{decision_data['philosophical']['quote']}", styles['Normal']))
-            story.append(Spacer(1, 12))
-
-            # Archetype
-            story.append(Paragraph("<b>Archetype:</b>", styles['Heading2']))
-            story.append(Paragraph(f"{decision_data['archetype']['name']}", styles['Normal']))
-            story.append(Paragraph(f"{decision_data['archetype']['description']}", styles['Italic']))
-            story.append(Paragraph(f"{decision_data['archetype']['quote']}", styles['Normal']))
-            story.append(Spacer(1, 12))
-
-            # Evolutionary
-            story.append(Paragraph("<b>Evolutionary Insight:</b>", styles['Heading2']))
-            story.append(Paragraph(f"{decision_data['evolutionary']['name']}", styles['Normal']))
-            story.append(Paragraph(f"{decision_data['evolutionary']['insight']}", styles['Normal']))
-            story.append(Spacer(1, 12))
-
-            # Wisdom Score
-            story.append(Paragraph("<b>Wisdom Score:</b>", styles['Heading2']))
-            story.append(Paragraph(f"{decision_data['wisdom_score']} / 5", styles['Normal']))
-            story.append(Spacer(1, 12))
-
-            # Reflections
-            story.append(Paragraph("<b>Reflections:</b>", styles['Heading2']))
-            for option in decision_data['options']:
-                if option in decision_data['reflections']:
-                    ref = decision_data['reflections'][option]
-                    story.append(Paragraph(f"<b>{option}:</b>", styles['Heading3']))
-                    for aspect in decision_data['aspects']:
-                        if aspect in ref and 'why' in ref[aspect] and ref[aspect]['why'].strip():
-                            story.append(Paragraph(f"<i>{aspect}:</i> {ref[aspect]['why']}", styles['Normal']))
-                    if 'social' in ref and ref['social']['whose'].strip():
-                        story.append(Paragraph(f"<i>Social:</i> Influenced by {ref['social']['whose']}", styles['Normal']))
-                    vals = [v for v in ref['values'] if v.strip()]
-                    if vals:
-                        story.append(Paragraph(f"<i>Values:</i> {', '.join(vals)}", styles['Normal']))
-            story.append(Spacer(1, 12))
-
-            doc.build(story)
-            buffer.seek(0)
-            return buffer
-
-        pdf_buffer = create_pdf(decision_data)
+        pdf_buffer, _ = create_pdf([decision_data], PDF_CATALOGS)
         st.download_button(
             label="📄 Download PDF Report",
             data=pdf_buffer,
@@ -755,32 +1225,26 @@ st.subheader("📂 Past Decisions")
 if 'saved_decisions' in st.session_state and st.session_state.saved_decisions:
     for i, decision in enumerate(st.session_state.saved_decisions):
         with st.expander(f"Decision #{i+1} - {decision['timestamp']}"):
-            st.write("**Options:**", decision['options'])
-            st.write("**Aspects:**", decision['aspects'])
-            st.write("**Weights:**", decision['weights'])
-            st.write("**Results:**")
+            st.markdown(
+                f"**Options:** {', '.join(decision['options'])}  \n"
+                f"**Aspects:** {', '.join(decision['aspects'])}  \n"
+                f"**Weights:** {', '.join(f'{a}: {w}' for a, w in decision['weights'].items())}  \n"
+                "**Results:**"
+            )
             results_df = pd.DataFrame(decision['results'])
             st.dataframe(results_df)
-            
-            st.write("**Reflection Summary:**")
-            for option in decision['options']:
-                if option in decision['reflections']:
-                    ref = decision['reflections'][option]
-                    st.write(f"**{option}:**")
-                    for aspect in decision['aspects']:
-                        if aspect in ref and 'why' in ref[aspect] and ref[aspect]['why'].strip():
-                            st.write(f"- {aspect}: {ref[aspect]['why']}")
-                    if 'social' in ref and ref['social']['whose'].strip():
-                        st.write(f"👥 Social: Influenced by {ref['social']['whose']}")
-                    vals = [v for v in ref['values'] if v.strip()]
-                    if vals:
-                        st.write(f"🌟 Values: {', '.join(vals)}")
-            
-            st.write(f"🎭 Archetype: {decision.get('archetype', {}).get('name', 'N/A')}")
-            st.write(f"🧠 Philosophical Lens: {decision.get('philosophical', {}).get('name', 'N/A')}")
-            st.write(f"🧬 Evolutionary Insight: {decision.get('evolutionary', {}).get('name', 'N/A')}")
-            st.write(f"✨ Wisdom Score: {decision.get('wisdom_score', 'N/A')}")
-            st.write(f"😊 Mood: {decision.get('mood', 'N/A')}")
+            st.markdown(render_decision_summary(decision))
+
+    if st.button("📚 Prepare PDF of All Past Decisions"):
+        all_pdf_buffer, included = create_pdf(st.session_state.saved_decisions, PDF_CATALOGS)
+        st.download_button(
+            label="📄 Download All Past Decisions (PDF)",
+            data=all_pdf_buffer,
+            file_name=f"decision_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+            mime="application/pdf"
+        )
+        if included < len(st.session_state.saved_decisions):
+            st.caption(f"📄 Includes the {included} most recent decisions; older ones are still listed above.")
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,69 @@
+# Measures PDF build time and peak Python memory for pdf_report.create_pdf.
+# Run with: python bench_pdf.py
+import sys
+import time
+import tracemalloc
+
+from pdf_report import create_pdf, PDF_MAX_DECISIONS, MAX_REFLECTION_CHARS, MAX_SHORT_TEXT_CHARS
+
+PEAK_BUDGET_MB = 32
+
+ASPECTS = ["Values Alignment", "Long-Term Vision", "Emotional Resonance",
+           "Impact on Others & System", "Risk Tolerance", "Intuition"]
+
+def filler(length):
+    return ("I keep coming back to this < that & the other. " * (length // 48 + 1))[:length]
+
+def make_decision(num_options, why_length, num_aspects=len(ASPECTS), short_length=10):
+    options = [f"{i} " + filler(short_length - 3) for i in range(num_options)]
+    aspects = ASPECTS[:num_aspects] + [f"{i} " + filler(short_length - 3) for i in range(len(ASPECTS), num_aspects)]
+    why = filler(why_length)
+    short = filler(short_length)
+    return {
+        "timestamp": "2026-01-01T00:00:00",
+        "options": options,
+        "aspects": aspects,
+        "results": [{"Option": opt, "Total Score": 60} for opt in options],
+        "philosophical": {"name": "Stoic Lens", "insight": "What is within your control?", "quote": "Seneca"},
+        "archetype": "hero",
+        "evolutionary": "autonomous",
+        "wisdom_score": 3.5,
+        "reflections": {
+            opt: {
+                **{a: {"score": 3, "why": why} for a in aspects},
+                "social": {"influence": 3, "whose": short},
+                "values": [short, short, short],
+            }
+            for opt in options
+        },
+    }
+
+CATALOGS = {"philosophical": {}, "archetype": {}, "evolutionary": {}}
+
+def measure(label, decisions):
+    # Timed without tracing, since tracemalloc slows allocation-heavy builds a lot
+    start = time.perf_counter()
+    buffer, included = create_pdf(decisions, CATALOGS)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    create_pdf(decisions, CATALOGS)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    peak_mb = peak / 1024 ** 2
+    print(f"{label:<40} {included:>3} decisions  {len(buffer.getvalue()) / 1024:>8.0f} KB  "
+          f"{elapsed:>6.2f} s  peak {peak_mb:>6.1f} MB")
+    return peak_mb
+
+if __name__ == "__main__":
+    # Every field at its input limit with 10 options x 10 aspects: the largest
+    # decision the app can produce
+    largest = make_decision(10, MAX_REFLECTION_CHARS, num_aspects=10, short_length=MAX_SHORT_TEXT_CHARS)
+    peaks = [
+        measure("single decision, short reflections", [make_decision(2, 200)]),
+        measure("single decision at input limits", [largest]),
+        # Far beyond both report caps, so this is the largest report the app can build
+        measure("history beyond report caps", [largest] * (2 * PDF_MAX_DECISIONS)),
+    ]
+    if max(peaks) > PEAK_BUDGET_MB:
+        print(f"Peak memory exceeds the {PEAK_BUDGET_MB} MB budget")
+        sys.exit(1)
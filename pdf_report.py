@@ -0,0 +1,149 @@
+# PDF export for decision reports. Kept free of Streamlit calls so it can be
+# imported by bench_pdf.py as well as app.py.
+import io
+from functools import lru_cache
+
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+from reportlab.lib.styles import getSampleStyleSheet
+
+# User text is escaped in one translate() pass before it reaches Paragraph
+# markup. Memory is bounded by the size of the text that goes into one report:
+# - app.py limits each reflection to MAX_REFLECTION_CHARS and every name or
+#   short answer to MAX_SHORT_TEXT_CHARS, so with at most 10 options x 10
+#   aspects one decision carries under 220k characters of user text. Longer
+#   fields (e.g. from older saved data) are cut here with a visible marker.
+# - A report holds at most PDF_MAX_DECISIONS decisions and PDF_MAX_TEXT
+#   characters, newest first. The newest decision is always included, which
+#   stays within PDF_MAX_TEXT because one decision is capped as above.
+# bench_pdf.py measures the peak for the largest single decision (about 5 MB)
+# and the largest report (about 10 MB).
+PDF_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+PDF_MAX_DECISIONS = 50
+PDF_MAX_TEXT = 500_000
+MAX_REFLECTION_CHARS = 2000
+MAX_SHORT_TEXT_CHARS = 100
+TRUNCATION_MARKER = " […truncated]"
+
+@lru_cache(maxsize=None)
+def get_pdf_styles():
+    # Built once per process and shared by every report
+    return getSampleStyleSheet()
+
+def pdf_text(value):
+    text = str(value)
+    if len(text) > MAX_REFLECTION_CHARS:
+        text = text[:MAX_REFLECTION_CHARS] + TRUNCATION_MARKER
+    return text.translate(PDF_ESCAPES)
+
+def catalog_entry(value, catalog):
+    # Saved decisions store some insights as catalog keys and others as dicts
+    return value if isinstance(value, dict) else catalog.get(value, {})
+
+def reflection_size(decision_data):
+    size = 0
+    for ref in decision_data.get('reflections', {}).values():
+        for entry in ref.values():
+            if isinstance(entry, dict):
+                size += len(entry.get('why', '')) + len(entry.get('whose', ''))
+            elif isinstance(entry, list):
+                size += sum(len(v) for v in entry)
+    return size
+
+def select_decisions(decisions):
+    # Newest decisions that fit within the report caps, in original order
+    selected, total = [], 0
+    for decision_data in reversed(decisions[-PDF_MAX_DECISIONS:]):
+        total += reflection_size(decision_data)
+        if selected and total > PDF_MAX_TEXT:
+            break
+        selected.append(decision_data)
+    return selected[::-1]
+
+def decision_story(decision_data, styles, catalogs):
+    story = []
+
+    # Title
+    story.append(Paragraph("The Philosopher's Mirror - Decision Report", styles['Title']))
+    story.append(Spacer(1, 12))
+
+    # Timestamp
+    story.append(Paragraph(f"<b>Timestamp:</b> {pdf_text(decision_data['timestamp'])}", styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    # Options
+    story.append(Paragraph("<b>Options:</b>", styles['Heading2']))
+    for opt in decision_data['options']:
+        story.append(Paragraph(f"• {pdf_text(opt)}", styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    # Aspects
+    story.append(Paragraph("<b>Aspects:</b>", styles['Heading2']))
+    for aspect in decision_data['aspects']:
+        story.append(Paragraph(f"• {pdf_text(aspect)}", styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    # Results
+    story.append(Paragraph("<b>Results:</b>", styles['Heading2']))
+    for result in decision_data['results']:
+        story.append(Paragraph(f"{pdf_text(result['Option'])}: {pdf_text(result['Total Score'])}", styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    # Philosophical Insight
+    philosophical = catalog_entry(decision_data['philosophical'], catalogs['philosophical'])
+    story.append(Paragraph("<b>Philosophical Lens:</b>", styles['Heading2']))
+    story.append(Paragraph(pdf_text(philosophical.get('name', 'N/A')), styles['Normal']))
+    story.append(Paragraph(pdf_text(philosophical.get('insight', '')), styles['Italic']))
+    story.append(Paragraph(pdf_text(philosophical.get('quote', '')), styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    # Archetype
+    archetype = catalog_entry(decision_data['archetype'], catalogs['archetype'])
+    story.append(Paragraph("<b>Archetype:</b>", styles['Heading2']))
+    story.append(Paragraph(pdf_text(archetype.get('name', 'N/A')), styles['Normal']))
+    story.append(Paragraph(pdf_text(archetype.get('description', '')), styles['Italic']))
+    story.append(Paragraph(pdf_text(archetype.get('quote', '')), styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    # Evolutionary
+    evolutionary = catalog_entry(decision_data['evolutionary'], catalogs['evolutionary'])
+    story.append(Paragraph("<b>Evolutionary Insight:</b>", styles['Heading2']))
+    story.append(Paragraph(pdf_text(evolutionary.get('name', 'N/A')), styles['Normal']))
+    story.append(Paragraph(pdf_text(evolutionary.get('insight', '')), styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    # Wisdom Score
+    story.append(Paragraph("<b>Wisdom Score:</b>", styles['Heading2']))
+    story.append(Paragraph(f"{pdf_text(decision_data['wisdom_score'])} / 5", styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    # Reflections
+    story.append(Paragraph("<b>Reflections:</b>", styles['Heading2']))
+    for option in decision_data['options']:
+        if option in decision_data['reflections']:
+            ref = decision_data['reflections'][option]
+            story.append(Paragraph(f"<b>{pdf_text(option)}:</b>", styles['Heading3']))
+            for aspect in decision_data['aspects']:
+                if aspect in ref and 'why' in ref[aspect] and ref[aspect]['why'].strip():
+                    story.append(Paragraph(f"<i>{pdf_text(aspect)}:</i> {pdf_text(ref[aspect]['why'])}", styles['Normal']))
+            if 'social' in ref and ref['social']['whose'].strip():
+                story.append(Paragraph(f"<i>Social:</i> Influenced by {pdf_text(ref['social']['whose'])}", styles['Normal']))
+            vals = [v for v in ref['values'] if v.strip()]
+            if vals:
+                story.append(Paragraph(f"<i>Values:</i> {pdf_text(', '.join(vals))}", styles['Normal']))
+    story.append(Spacer(1, 12))
+    return story
+
+def create_pdf(decisions, catalogs):
+    # Returns the PDF buffer and how many of the most recent decisions it covers
+    selected = select_decisions(decisions)
+    styles = get_pdf_styles()
+    story = []
+    for n, decision_data in enumerate(selected):
+        if n:
+            story.append(PageBreak())
+        story.extend(decision_story(decision_data, styles, catalogs))
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=letter).build(story)
+    buffer.seek(0)
+    return buffer, len(selected)